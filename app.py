@@ -1,4 +1,6 @@
-from flask import Flask, jsonify, request, render_template, Response
+from flask import Flask, jsonify, request, render_template, Response, abort
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 import logging
 import sys
 from youtube_transcript_api import YouTubeTranscriptApi
@@ -10,23 +12,66 @@ from youtube_transcript_api._errors import (
     VideoUnplayable
 )
 from xml.etree.ElementTree import ParseError
-from functools import lru_cache
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from cachetools import TTLCache, cached
+from diskcache import Cache
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from googleapiclient.model import JsonModel
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import namedtuple
+from dataclasses import dataclass
+from array import array
+import atexit
+import functools
+import hashlib
+import httplib2
+import httpx
+import json
 import os
 import re
-import isodate
-import functools
+import socket
+import string
+import subprocess
+import tempfile
+import orjson
+import redis
 import threading
-import requests
 import time
-from urllib.parse import urlencode
 
 app = Flask(__name__)
 
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson, which encodes straight to bytes and is
+    several times faster than the stdlib encoder on large transcripts and
+    comment lists.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype='application/json'
+        )
+
+app.json = OrjsonProvider(app)
+
+# Compress JSON responses (transcripts and comment lists compress well),
+# preferring Brotli for clients that accept it
+app.config.update(
+    COMPRESS_MIMETYPES=['application/json'],
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_LEVEL=6,
+    COMPRESS_MIN_SIZE=500
+)
+Compress(app)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,82 +82,772 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Configure rate limiter
-limiter = Limiter(
-    app=app,
-    key_func=get_remote_address,
-    default_limits=["100 per day", "100 per minute"]
-)
+# Rate limiting: a token bucket per (client address, endpoint)
+RATE_LIMIT_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Applied to endpoints without an explicit @rate_limit
+DEFAULT_RATE_LIMIT = "100 per day"
+
+class TokenBucket:
+    """
+    Token bucket holding up to `capacity` tokens, refilled continuously at
+    `refill_rate` tokens per second.
+    """
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, tokens=1):
+        """Take `tokens` from the bucket; return False if not enough are available."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+            self.last_refill = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+def parse_rate_limit(limit):
+    """Parse a limit such as "10 per minute" into (capacity, refill_rate)."""
+    count, _, period = limit.split()
+    capacity = int(count)
+    return capacity, capacity / RATE_LIMIT_PERIODS[period]
+
+# Limits are parsed once, at decoration time, into (limit, capacity, refill_rate)
+_endpoint_rate_limits = {}
+_default_rate_limit = (DEFAULT_RATE_LIMIT, *parse_rate_limit(DEFAULT_RATE_LIMIT))
+
+# In-process buckets, most recently used first. An entry expires once it has
+# been idle for the longest limit period; by then its bucket would have
+# refilled completely, so dropping it is the same as keeping a full bucket
+RATE_LIMIT_MAX_CLIENTS = 10000
+_rate_limit_buckets = TTLCache(maxsize=RATE_LIMIT_MAX_CLIENTS, ttl=max(RATE_LIMIT_PERIODS.values()))
+_rate_limit_lock = threading.Lock()
+
+def rate_limit(limit):
+    """Decorator setting the rate limit (e.g. "10 per minute") for a view function."""
+    def decorator(func):
+        _endpoint_rate_limits[func.__name__] = (limit, *parse_rate_limit(limit))
+        return func
+    return decorator
+
+def consume_rate_limit(endpoint, client):
+    """
+    Take one token from `client`'s bucket for `endpoint`. Returns None if the
+    request is allowed, else the exceeded limit (e.g. "100 per day").
+    """
+    limit, capacity, refill_rate = _endpoint_rate_limits.get(endpoint, _default_rate_limit)
+
+    # With REDIS_URL set the buckets live in Redis and are shared by every
+    # worker; the in-process buckets below are the fallback
+    if redis_client is not None:
+        allowed = redis_consume(f'yt:ratelimit:{endpoint}:{client}', capacity, refill_rate)
+        if allowed is not None:
+            return None if allowed else limit
+
+    key = (client, endpoint)
+    with _rate_limit_lock:
+        bucket = _rate_limit_buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(capacity, refill_rate)
+        # Re-inserting restarts the entry's idle timer
+        _rate_limit_buckets[key] = bucket
+
+    return None if bucket.consume() else limit
+
+@app.before_request
+def enforce_rate_limit():
+    if request.endpoint is None or request.endpoint == 'static':
+        return
+
+    # Responses served from a cached_json cache cost no upstream calls, so
+    # they are not charged against the client's limit
+    view = app.view_functions[request.endpoint]
+    response_cache = getattr(view, 'response_cache', None)
+    if response_cache is not None:
+        with view.response_cache_lock:
+            cached = request.full_path in response_cache
+        if cached:
+            return
+
+    exceeded = consume_rate_limit(request.endpoint, request.remote_addr)
+    if exceeded is not None:
+        abort(429, description=exceeded)
 
 # YouTube API setup
 YOUTUBE_API_KEY = os.environ.get('YOUTUBE_API_KEY')
-youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY) if YOUTUBE_API_KEY else None
+class OrjsonModel(JsonModel):
+    """JsonModel that decodes API responses with orjson instead of the stdlib json module."""
+
+    def deserialize(self, content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().deserialize(content)
+
+# Use the discovery document bundled with google-api-python-client rather than
+# fetching it from Google on every cold start
+youtube = build(
+    'youtube', 'v3',
+    developerKey=YOUTUBE_API_KEY,
+    model=OrjsonModel(),
+    static_discovery=True,
+    cache_discovery=False
+) if YOUTUBE_API_KEY else None
+
+# Retries for transient YouTube API failures (5xx, 429), with backoff
+YOUTUBE_API_RETRIES = 2
+
+# All threads share one pooled httpx client, so concurrent API calls are
+# multiplexed over a few keep-alive HTTP/2 connections to googleapis.com
+# instead of each thread holding its own HTTP/1.1 connection
+http_client = httpx.Client(
+    http2=True,
+    timeout=60,
+    limits=httpx.Limits(max_keepalive_connections=50)
+)
+atexit.register(http_client.close)
+
+class HttpxHttp:
+    """httplib2.Http stand-in that sends googleapiclient requests through an httpx.Client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        # Map transport errors onto the exceptions googleapiclient retries on
+        try:
+            response = self.client.request(method, uri, content=body, headers=headers)
+        except httpx.TimeoutException as e:
+            raise socket.timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+
+        # httpx has already decoded the body, so drop its content-encoding
+        info = {k: v for k, v in response.headers.items() if k != 'content-encoding'}
+        info['status'] = str(response.status_code)
+        return httplib2.Response(info), response.content
+
+api_http = HttpxHttp(http_client)
+
+# Outbound quota budget: the project's daily YouTube Data API allowance,
+# refilled evenly over the day so a burst of calls cannot drain it at once.
+# State is saved to QUOTA_STATE_FILE so restarts do not hand out a fresh budget.
+YOUTUBE_DAILY_QUOTA = int(os.environ.get('YOUTUBE_DAILY_QUOTA', 10000))
+QUOTA_STATE_FILE = os.environ.get(
+    'QUOTA_STATE_FILE',
+    os.path.join(tempfile.gettempdir(), 'yt-fetcher-quota.json')
+)
+
+# Longest a call will wait for quota to refill before failing
+QUOTA_WAIT_SECONDS = 5
+
+# Minimum seconds between quota state saves (the final state is saved at exit)
+QUOTA_SAVE_INTERVAL = 5
+
+# Quota units per call type (https://developers.google.com/youtube/v3/determine_quota_cost)
+LIST_QUOTA_COST = 1
+SEARCH_QUOTA_COST = 100
+
+class QuotaBucket(TokenBucket):
+    """TokenBucket for outbound API quota whose state survives restarts."""
+
+    def __init__(self, capacity, refill_rate, state_file):
+        super().__init__(capacity, refill_rate)
+        self.state_file = state_file
+        self.last_save = 0.0
+        self.save_registered = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+            # Credit the refill accrued while the process was down
+            elapsed = max(0.0, time.time() - state['saved_at'])
+            self.tokens = min(self.capacity, state['tokens'] + elapsed * self.refill_rate)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def save(self):
+        """Atomically replace the state file with the current bucket state."""
+        # Each save gets its own temp file and runs under the bucket lock, so
+        # concurrent savers never share or truncate one another's file
+        with self.lock:
+            self.last_save = time.monotonic()
+            tmp_file = None
+            try:
+                fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.state_file)), suffix='.tmp')
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({'tokens': self.tokens, 'saved_at': time.time()}, f)
+                os.replace(tmp_file, self.state_file)
+            except OSError as e:
+                logger.warning(f"Could not save quota state: {e}")
+                if tmp_file is not None and os.path.exists(tmp_file):
+                    os.unlink(tmp_file)
+
+    def acquire(self, tokens, timeout):
+        """Take `tokens`, waiting up to `timeout` seconds for refill; return False on timeout."""
+        deadline = time.monotonic() + timeout
+        while not self.consume(tokens):
+            wait = (tokens - self.tokens) / self.refill_rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+        # Save at exit only in a process that has spent quota; a preloading
+        # gunicorn master never does, and its exit-time save would otherwise
+        # overwrite the workers' state with the count from boot
+        with self.lock:
+            if not self.save_registered:
+                self.save_registered = True
+                atexit.register(self.save)
+        if time.monotonic() - self.last_save >= QUOTA_SAVE_INTERVAL:
+            self.save()
+        return True
+
+quota_bucket = QuotaBucket(YOUTUBE_DAILY_QUOTA, YOUTUBE_DAILY_QUOTA / 86400, QUOTA_STATE_FILE)
+
+def execute_request(request, quota_cost=LIST_QUOTA_COST):
+    """
+    Execute a googleapiclient request over the shared HTTP/2 client, after
+    taking its quota cost from the outbound quota budget.
+    """
+    if not quota_bucket.acquire(quota_cost, QUOTA_WAIT_SECONDS):
+        raise Exception("YouTube API quota exceeded: local daily quota budget is exhausted")
+    return request.execute(http=api_http, num_retries=YOUTUBE_API_RETRIES)
+
+# Long-lived thread pool for parallel upstream fetches, shared across requests
+# so threads are reused (API calls all go through the shared http_client)
+fetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('YT_WORKERS', 8)),
+    thread_name_prefix='yt-fetch'
+)
+atexit.register(fetch_executor.shutdown)
 
 # YouTube Transcript API instance
 ytt_api = YouTubeTranscriptApi()
 
-# Cache configuration using LRU cache
-@lru_cache(maxsize=100)
+# videos.list accepts at most 50 comma-separated IDs per request
+VIDEOS_LIST_MAX_IDS = 50
+
+# Upper bound on IDs accepted by /api/videos in a single call
+BULK_MAX_IDS = 250
+
+# commentThreads.list returns at most 100 comments per page; /api/comments
+# can follow up to COMMENTS_MAX_PAGES pages
+COMMENTS_MAX_RESULTS = 100
+COMMENTS_MAX_PAGES = 5
+
+# Partial-response selectors (the `fields` parameter) so the API only returns
+# the keys we read, keeping payloads and JSON decoding small
+THUMBNAIL_FIELDS = 'thumbnails(default/url,medium/url,high/url)'
+VIDEO_FIELDS = (
+    'etag,items(id,'
+    'snippet(title,description,tags,categoryId,thumbnails,channelTitle,publishedAt),'
+    'statistics(viewCount,likeCount,commentCount),'
+    'contentDetails(duration,definition,caption))'
+)
+COMMENT_FIELDS = 'nextPageToken,items/snippet/topLevelComment/snippet(authorDisplayName,textDisplay,likeCount,publishedAt)'
+SEARCH_FIELDS = f'items(id/videoId,snippet(title,description,{THUMBNAIL_FIELDS},channelTitle,publishedAt))'
+CHANNEL_FIELDS = (
+    f'items(id,snippet(title,description,publishedAt,{THUMBNAIL_FIELDS}),'
+    'statistics(subscriberCount,videoCount,viewCount))'
+)
+
+# Optional persistent cache shared by all worker processes on this host, so
+# restarts and extra workers reuse API responses instead of spending quota again
+CACHE_DIR = os.environ.get('CACHE_DIR')
+disk_cache = Cache(CACHE_DIR) if CACHE_DIR else None
+
+# Optional Redis cache (REDIS_URL), used in place of the disk cache so workers
+# on every host share one copy of each API response
+REDIS_URL = os.environ.get('REDIS_URL')
+redis_client = redis.Redis.from_url(
+    REDIS_URL,
+    socket_timeout=0.5,
+    socket_connect_timeout=0.5
+) if REDIS_URL else None
+
+class CircuitBreaker:
+    """Skip a failing dependency for `reset_timeout` seconds after `max_failures` consecutive errors."""
+
+    def __init__(self, max_failures=3, reset_timeout=30):
+        self.max_failures = max_failures
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.open_until = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        return time.monotonic() >= self.open_until
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.max_failures:
+                self.failures = 0
+                self.open_until = time.monotonic() + self.reset_timeout
+                logger.warning(f"Redis cache unavailable, bypassing it for {self.reset_timeout}s")
+
+redis_breaker = CircuitBreaker()
+
+def _orjson_default(obj):
+    """Serialize the non-JSON types our cached results and arguments contain."""
+    if isinstance(obj, array):
+        return obj.tolist()
+    if isinstance(obj, tuple):
+        return list(obj)
+    raise TypeError
+
+def redis_get(key):
+    """Read a key from Redis, or return None if it is missing or Redis is unavailable."""
+    if not redis_breaker.allow():
+        return None
+    try:
+        value = redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Redis GET failed: {e}")
+        redis_breaker.record_failure()
+        return None
+    redis_breaker.record_success()
+    return value
+
+def redis_set(key, value, expire):
+    """Write a key to Redis with a TTL, ignoring errors while Redis is unavailable."""
+    if not redis_breaker.allow():
+        return
+    try:
+        redis_client.setex(key, expire, value)
+    except redis.RedisError as e:
+        logger.warning(f"Redis SETEX failed: {e}")
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+def redis_set_many(items, expire):
+    """Write {key: value} to Redis with a TTL in one pipelined round-trip."""
+    if not items or not redis_breaker.allow():
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.setex(key, expire, value)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Redis pipelined SETEX failed: {e}")
+        redis_breaker.record_failure()
+        return
+    redis_breaker.record_success()
+
+# Token bucket stored as a Redis hash {tokens, ts}, refilled and consumed
+# atomically; the key expires once the bucket would be full again
+REDIS_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate))
+return allowed
+"""
+# Registered once so each check sends only the script's SHA (EVALSHA)
+redis_token_bucket = redis_client.register_script(REDIS_TOKEN_BUCKET_SCRIPT) if redis_client else None
+
+def redis_consume(key, capacity, refill_rate):
+    """
+    Take one token from a Redis token bucket. Returns True or False, or None
+    if Redis is unavailable and the caller should fall back to a local bucket.
+    """
+    if not redis_breaker.allow():
+        return None
+    try:
+        allowed = redis_token_bucket(keys=[key], args=[capacity, refill_rate, time.time()])
+    except redis.RedisError as e:
+        logger.warning(f"Redis rate limit check failed: {e}")
+        redis_breaker.record_failure()
+        return None
+    redis_breaker.record_success()
+    return bool(allowed)
+
+def persistent_cache(expire, decode=None):
+    """
+    Memoize to Redis when REDIS_URL is set, else to the disk cache when
+    CACHE_DIR is set, for `expire` seconds; no-op otherwise.
+
+    Redis values are stored as orjson; `decode` rebuilds the function's
+    return type from the decoded JSON where it is not plain JSON data.
+    """
+    def decorator(func):
+        if redis_client is not None:
+            prefix = f'yt:{func.__name__}:'
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = prefix + orjson.dumps([args, kwargs], default=_orjson_default).decode()
+                value = redis_get(key)
+                if value is not None:
+                    result = orjson.loads(value)
+                    return decode(result) if decode else result
+                result = func(*args, **kwargs)
+                redis_set(key, orjson.dumps(result, default=_orjson_default), expire)
+                return result
+            return wrapper
+        if disk_cache is None:
+            return func
+        return disk_cache.memoize(expire=expire)(func)
+    return decorator
+
+# Video lookups are cached as {video_id: (etag, payload, timestamp)}. Entries
+# older than VIDEO_CACHE_TTL are revalidated with If-None-Match, which returns
+# 304 with no body when the video is unchanged. Entries stored by
+# get_videos_bulk have no per-video ETag and are simply refetched. With
+# REDIS_URL set, entries are also kept in Redis for VIDEO_ETAG_TTL so every
+# worker can revalidate against the same ETag.
+VIDEO_CACHE_TTL = 300
+VIDEO_CACHE_SIZE = 500
+VIDEO_ETAG_TTL = 7 * 86400
+_video_cache = {}
+_video_cache_lock = threading.Lock()
+
+def _store_video(video_id, entry):
+    with _video_cache_lock:
+        _video_cache.pop(video_id, None)
+        _video_cache[video_id] = entry
+        while len(_video_cache) > VIDEO_CACHE_SIZE:
+            _video_cache.pop(next(iter(_video_cache)))
+
+def cache_video(video_id, etag, payload):
+    """Store a video lookup result, evicting the oldest entries when full."""
+    entry = (etag, payload, time.time())
+    _store_video(video_id, entry)
+    if redis_client is not None:
+        redis_set(f'yt:video:{video_id}', orjson.dumps(entry), VIDEO_ETAG_TTL)
+
+def cache_videos(payloads):
+    """Store {video_id: payload} results that have no ETag, writing Redis in one round-trip."""
+    now = time.time()
+    entries = {video_id: (None, payload, now) for video_id, payload in payloads.items()}
+    for video_id, entry in entries.items():
+        _store_video(video_id, entry)
+    if redis_client is not None:
+        redis_set_many(
+            {f'yt:video:{video_id}': orjson.dumps(entry) for video_id, entry in entries.items()},
+            VIDEO_ETAG_TTL
+        )
+
+def lookup_video(video_id):
+    """Return the cached (etag, payload, timestamp) for a video, or None."""
+    with _video_cache_lock:
+        entry = _video_cache.get(video_id)
+    if entry is None and redis_client is not None:
+        value = redis_get(f'yt:video:{video_id}')
+        if value is not None:
+            entry = tuple(orjson.loads(value))
+            _store_video(video_id, entry)
+    return entry
+
+# Cache configuration: one TTL cache per resource kind, sized and expired
+# according to how often that data changes upstream
+_transcript_cache = TTLCache(maxsize=100, ttl=7 * 86400)
+_transcript_text_cache = TTLCache(maxsize=100, ttl=7 * 86400)
+_comments_cache = TTLCache(maxsize=500, ttl=3600)
+_all_comments_cache = TTLCache(maxsize=100, ttl=3600)
+_bulk_videos_cache = TTLCache(maxsize=50, ttl=VIDEO_CACHE_TTL)
+_search_cache = TTLCache(maxsize=50, ttl=3600)
+_channel_info_cache = TTLCache(maxsize=100, ttl=86400)
+_channel_uploads_cache = TTLCache(maxsize=50, ttl=3600)
+
+# Transcripts are cached as parallel arrays (structure of arrays) rather than
+# one dict per segment, which is several times smaller in memory
+Transcript = namedtuple('Transcript', ['texts', 'starts', 'durations'])
+
+def decode_transcript(data):
+    """Rebuild a Transcript from its JSON form ([texts, starts, durations])."""
+    texts, starts, durations = data
+    return Transcript(texts, array('d', starts), array('d', durations))
+
+@cached(cache=_transcript_cache, lock=threading.RLock())
+@persistent_cache(expire=_transcript_cache.ttl, decode=decode_transcript)
 def get_transcript(video_id):
-    transcript = ytt_api.fetch(video_id)
-    return transcript.to_raw_data()
+    snippets = ytt_api.fetch(video_id).snippets
+    return Transcript(
+        texts=[snippet.text for snippet in snippets],
+        starts=array('d', (snippet.start for snippet in snippets)),
+        durations=array('d', (snippet.duration for snippet in snippets))
+    )
+
+@cached(cache=_transcript_text_cache, lock=threading.RLock())
+@persistent_cache(expire=_transcript_text_cache.ttl)
+def get_transcript_text(video_id):
+    """Fetch a transcript as a single string with all segments joined by spaces."""
+    return " ".join(get_transcript(video_id).texts)
+
+def transcript_to_list(transcript):
+    """Expand a Transcript into the [{text, start, duration}, ...] response format."""
+    return [
+        {'text': text, 'start': start, 'duration': duration}
+        for text, start, duration in zip(transcript.texts, transcript.starts, transcript.durations)
+    ]
+
+# Comments are cached as slotted dataclasses, which are far smaller than one
+# dict per comment; orjson serializes them directly
+@dataclass(slots=True)
+class Comment:
+    author: str
+    text: str
+    likes: int
+    published_at: str
+
+def decode_comments(data):
+    """Rebuild a list of Comments from its JSON form."""
+    return [Comment(**comment) for comment in data]
+
+def comments_to_list(comments):
+    """Expand Comments into the [{author, text, likes, published_at}, ...] format."""
+    return [
+        {
+            'author': comment.author,
+            'text': comment.text,
+            'likes': comment.likes,
+            'published_at': comment.published_at
+        }
+        for comment in comments
+    ]
+
+def fetch_comment_page(video_id, page_token=None):
+    """Fetch one page of top-level comments by relevance as (comments, next_page_token)."""
+    request = youtube.commentThreads().list(
+        part="snippet",
+        videoId=video_id,
+        maxResults=COMMENTS_MAX_RESULTS,
+        order="relevance",
+        textFormat="plainText",
+        pageToken=page_token,
+        fields=COMMENT_FIELDS
+    )
+    response = execute_request(request)
+
+    comments = [
+        Comment(
+            author=comment['authorDisplayName'],
+            text=comment['textDisplay'],
+            likes=comment['likeCount'],
+            published_at=comment['publishedAt']
+        )
+        for comment in (item['snippet']['topLevelComment']['snippet'] for item in response['items'])
+    ]
+    return comments, response.get('nextPageToken')
 
-@lru_cache(maxsize=100)
-def get_video_comments(video_id, max_results=100):
+@cached(cache=_comments_cache, lock=threading.RLock())
+@persistent_cache(expire=_comments_cache.ttl, decode=decode_comments)
+def get_video_comments(video_id):
+    """
+    Fetch a video's top COMMENTS_MAX_RESULTS comments by relevance as Comments.
+
+    Always fetches the full page so there is one cache entry per video;
+    callers wanting fewer comments slice the returned list.
+    """
     if not youtube:
         raise Exception("YouTube API key not configured. Set YOUTUBE_API_KEY environment variable.")
     try:
-        request = youtube.commentThreads().list(
-            part="snippet",
-            videoId=video_id,
-            maxResults=max_results,
-            order="relevance",
-            textFormat="plainText"
-        )
-        response = request.execute()
-
-        comments = []
-        for item in response['items']:
-            comment = item['snippet']['topLevelComment']['snippet']
-            comments.append({
-                'author': comment['authorDisplayName'],
-                'text': comment['textDisplay'],
-                'likes': comment['likeCount'],
-                'published_at': comment['publishedAt']
-            })
-
+        comments, _ = fetch_comment_page(video_id)
         return comments
     except HttpError as e:
         if e.resp.status == 403:
             raise Exception("Comments are disabled for this video")
         raise e
 
-@lru_cache(maxsize=100)
-def get_video_metadata(video_id):
+class TruncatedComments(Exception):
+    """Raised with the comments fetched before a later page failed."""
+
+    def __init__(self, comments, error):
+        super().__init__(str(error))
+        self.comments = comments
+
+def get_all_video_comments(video_id, pages=COMMENTS_MAX_PAGES):
+    """
+    Fetch up to `pages` pages of comments by relevance as Comments, in order.
+
+    Returns (comments, truncated). If a page after the first fails (e.g.
+    quotaExceeded), the comments fetched so far are returned with truncated
+    set; those are not cached, so the next call retries the missing pages.
+    """
+    try:
+        return _fetch_all_video_comments(video_id, pages), False
+    except TruncatedComments as e:
+        return e.comments, True
+
+@cached(cache=_all_comments_cache, lock=threading.RLock())
+@persistent_cache(expire=_all_comments_cache.ttl, decode=decode_comments)
+def _fetch_all_video_comments(video_id, pages):
+    # Each page needs the previous page's nextPageToken, so pages are fetched
+    # one after another
     if not youtube:
         raise Exception("YouTube API key not configured. Set YOUTUBE_API_KEY environment variable.")
-    try:
-        request = youtube.videos().list(
-            part='snippet',
-            id=video_id
-        )
-        response = request.execute()
 
-        if not response.get('items'):
-            raise Exception("Video not found")
+    comments = []
+    page_token = None
+    for page in range(pages):
+        try:
+            page_comments, page_token = fetch_comment_page(video_id, page_token)
+        except Exception as e:
+            if page > 0:
+                logger.warning(f"Stopping comment pagination for {video_id} after {page} pages: {e}")
+                # Raise rather than return so the caches skip the short list
+                raise TruncatedComments(comments, e)
+            if isinstance(e, HttpError) and e.resp.status == 403:
+                raise Exception("Comments are disabled for this video")
+            raise e
 
-        video_data = response['items'][0]
-        snippet = video_data['snippet']
+        comments.extend(page_comments)
+        if not page_token:
+            break
 
-        return {
-            'title': snippet.get('title', ''),
-            'description': snippet.get('description', ''),
-            'tags': snippet.get('tags', []),
-            'category_id': snippet.get('categoryId', ''),
-            'thumbnails': snippet.get('thumbnails', {}),
-            'channel_title': snippet.get('channelTitle', ''),
-            'published_at': snippet.get('publishedAt', '')
-        }
+    return comments
+
+# Sentinel a VideoBatcher resolves a lookup with when its If-None-Match ETag
+# still matches (HTTP 304)
+NOT_MODIFIED = object()
+
+class VideoBatcher:
+    """
+    Coalesce concurrent single-video lookups into batched videos.list calls.
+
+    Lookups submitted within `window` seconds of each other are sent as one
+    videos.list request of up to VIDEOS_LIST_MAX_IDS IDs, which costs the
+    same single quota unit as a one-ID request. Each lookup's Future resolves
+    to its raw videos.list item, None if the video was not found, or
+    NOT_MODIFIED if it was revalidated with an unchanged ETag.
+    """
+
+    def __init__(self, window=0.01, max_ids=VIDEOS_LIST_MAX_IDS, dispatch_workers=4):
+        self.window = window
+        self.max_ids = max_ids
+        self.pending = {}  # video_id -> (etag, [futures])
+        self.cond = threading.Condition()
+        self.worker = None
+        # Batches get their own small pool so these cheap calls never queue
+        # behind slow transcript/comments fetches on fetch_executor
+        self.executor = ThreadPoolExecutor(max_workers=dispatch_workers, thread_name_prefix='yt-batch')
+        atexit.register(self.executor.shutdown)
+
+    def submit(self, video_id, etag=None):
+        """Queue a lookup for video_id and return a Future for its item."""
+        future = Future()
+        with self.cond:
+            if video_id in self.pending:
+                pending_etag, futures = self.pending[video_id]
+                futures.append(future)
+                # NOT_MODIFIED only helps callers holding the revalidated
+                # copy, so lookups that disagree on the ETag (or lack a cached
+                # copy) fetch the full item for everyone
+                if pending_etag != etag:
+                    self.pending[video_id] = (None, futures)
+            else:
+                self.pending[video_id] = (etag, [future])
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name='yt-batcher', daemon=True)
+                self.worker.start()
+            self.cond.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+            # Debounce so lookups arriving together share one request
+            time.sleep(self.window)
+            with self.cond:
+                batch = {}
+                for video_id in list(self.pending)[:self.max_ids]:
+                    batch[video_id] = self.pending.pop(video_id)
+            self.executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        # A response ETag only describes the video when it was fetched alone,
+        # so revalidation is limited to one-ID batches
+        etag = next(iter(batch.values()))[0] if len(batch) == 1 else None
+        try:
+            request = youtube.videos().list(
+                part='snippet,statistics,contentDetails',
+                id=','.join(batch),
+                fields=VIDEO_FIELDS
+            )
+            if etag:
+                request.headers['If-None-Match'] = etag
+            response = execute_request(request)
+        except HttpError as e:
+            if e.resp.status == 304:
+                results = dict.fromkeys(batch, NOT_MODIFIED)
+            else:
+                return self._fail(batch, e)
+        except Exception as e:
+            return self._fail(batch, e)
+        else:
+            response_etag = response.get('etag') if len(batch) == 1 else None
+            results = {
+                item['id']: (response_etag, item)
+                for item in response.get('items', [])
+            }
+
+        for video_id, (_, futures) in batch.items():
+            for future in futures:
+                future.set_result(results.get(video_id))
+
+    @staticmethod
+    def _fail(batch, error):
+        for _, futures in batch.values():
+            for future in futures:
+                future.set_exception(error)
+
+video_batcher = VideoBatcher()
+
+def get_video_full(video_id):
+    """
+    Fetch video metadata and statistics from YouTube Data API v3 in one call.
+
+    Requests snippet, statistics and contentDetails together so callers that
+    need both metadata and statistics pay for a single round-trip. Cache
+    misses go through video_batcher, so concurrent lookups for different
+    videos share a videos.list request. Results are cached and revalidated
+    with their ETag once stale.
+
+    Args:
+        video_id: YouTube video ID (11 characters)
+
+    Returns:
+        Dictionary with 'metadata' and 'statistics' keys, shaped like the
+        return values of get_video_metadata and get_video_statistics
+
+    Raises:
+        Exception: If video not found or access is forbidden
+    """
+    if not youtube:
+        raise Exception("YouTube API key not configured. Set YOUTUBE_API_KEY environment variable.")
+
+    entry = lookup_video(video_id)
+    if entry and time.time() - entry[2] < VIDEO_CACHE_TTL:
+        return entry[1]
+
+    try:
+        result = video_batcher.submit(video_id, entry[0] if entry else None).result()
     except HttpError as e:
         if e.resp.status == 403:
             raise Exception("Access forbidden")
@@ -120,92 +855,170 @@ def get_video_metadata(video_id):
             raise Exception("Video not found")
         raise e
 
-@lru_cache(maxsize=100)
-def get_video_statistics(video_id):
+    if result is NOT_MODIFIED:
+        # Unchanged since the cached copy: refresh its timestamp
+        cache_video(video_id, entry[0], entry[1])
+        return entry[1]
+    if not result:
+        raise Exception("Video not found")
+
+    etag, item = result
+    video = parse_video_item(item)
+    cache_video(video_id, etag, video)
+    return video
+
+def get_videos_bulk(video_ids):
     """
-    Fetch video statistics from YouTube Data API v3.
+    Fetch metadata and statistics for many videos with batched videos.list calls.
+
+    The YouTube Data API accepts up to 50 comma-separated IDs per videos.list
+    request at the same quota cost as a single ID, so IDs are fetched in
+    chunks of 50. Results are also stored for get_video_full to reuse.
 
     Args:
-        video_id: YouTube video ID (11 characters)
+        video_ids: Iterable of YouTube video IDs (11 characters each)
 
     Returns:
-        Dictionary with view_count, like_count, comment_count, duration (parsed),
-        definition, and caption status
+        Dictionary keyed by video_id; each value has 'metadata' and
+        'statistics' keys. Videos that were not found are omitted.
 
     Raises:
-        Exception: If video not found or access is forbidden
+        Exception: If access is forbidden or another API error occurs
     """
+    # A sorted tuple gives the same cache key for the same ID set in every
+    # process (a pickled frozenset's order varies with hash randomization)
+    return _fetch_videos_bulk(tuple(sorted(set(video_ids))))
+
+@cached(cache=_bulk_videos_cache, lock=threading.RLock())
+@persistent_cache(expire=_bulk_videos_cache.ttl)
+def _fetch_videos_bulk(video_ids):
     if not youtube:
         raise Exception("YouTube API key not configured. Set YOUTUBE_API_KEY environment variable.")
-    try:
-        request = youtube.videos().list(
-            part='statistics,contentDetails',
-            id=video_id
-        )
-        response = request.execute()
-
-        if not response.get('items'):
-            raise Exception("Video not found")
 
-        video_data = response['items'][0]
-        statistics = video_data.get('statistics', {})
-        details = video_data.get('contentDetails', {})
-
-        # Extract statistics (convert to int, default to 0 if missing)
-        view_count = int(statistics.get('viewCount', 0))
-        like_count = int(statistics.get('likeCount', 0))
-        comment_count = int(statistics.get('commentCount', 0))
-
-        # Extract content details
-        duration_raw = details.get('duration', '')
-        definition = details.get('definition', '')
-        caption = details.get('caption', 'false') == 'true'
-
-        # Parse duration from ISO 8601 format
-        duration_parsed = parse_duration(duration_raw) if duration_raw else {
-            'raw': '',
-            'total_seconds': 0,
-            'hours': 0,
-            'minutes': 0,
-            'seconds': 0
-        }
+    videos = {}
+    try:
+        for i in range(0, len(video_ids), VIDEOS_LIST_MAX_IDS):
+            chunk = video_ids[i:i + VIDEOS_LIST_MAX_IDS]
+            request = youtube.videos().list(
+                part='snippet,statistics,contentDetails',
+                id=','.join(chunk),
+                fields=VIDEO_FIELDS
+            )
+            response = execute_request(request)
 
-        return {
-            'view_count': view_count,
-            'like_count': like_count,
-            'comment_count': comment_count,
-            'duration': duration_parsed,
-            'definition': definition,
-            'caption': caption
-        }
+            for item in response.get('items', []):
+                videos[item['id']] = parse_video_item(item)
 
     except HttpError as e:
         if e.resp.status == 403:
             raise Exception("Access forbidden")
-        elif e.resp.status == 404:
-            raise Exception("Video not found")
         raise e
 
-@lru_cache(maxsize=100)
-def get_unified_video_data(video_id):
+    cache_videos(videos)
+
+    return videos
+
+def parse_video_item(video_data):
+    """
+    Split a videos.list item into metadata and statistics dicts.
+
+    Args:
+        video_data: One item from a videos.list response requested with
+            part='snippet,statistics,contentDetails'
+
+    Returns:
+        Dictionary with 'metadata' and 'statistics' keys
+    """
+    snippet = video_data.get('snippet', {})
+    statistics = video_data.get('statistics', {})
+    details = video_data.get('contentDetails', {})
+
+    metadata = {
+        'title': snippet.get('title', ''),
+        'description': snippet.get('description', ''),
+        'tags': snippet.get('tags', []),
+        'category_id': snippet.get('categoryId', ''),
+        'thumbnails': snippet.get('thumbnails', {}),
+        'channel_title': snippet.get('channelTitle', ''),
+        'published_at': snippet.get('publishedAt', '')
+    }
+
+    # Extract content details
+    duration_raw = details.get('duration', '')
+
+    # Parse duration from ISO 8601 format
+    duration_parsed = parse_duration(duration_raw) if duration_raw else {
+        'raw': '',
+        'total_seconds': 0,
+        'hours': 0,
+        'minutes': 0,
+        'seconds': 0
+    }
+
+    # Extract statistics (convert to int, default to 0 if missing)
+    video_statistics = {
+        'view_count': int(statistics.get('viewCount', 0)),
+        'like_count': int(statistics.get('likeCount', 0)),
+        'comment_count': int(statistics.get('commentCount', 0)),
+        'duration': duration_parsed,
+        'definition': details.get('definition', ''),
+        'caption': details.get('caption', 'false') == 'true'
+    }
+
+    return {
+        'metadata': metadata,
+        'statistics': video_statistics
+    }
+
+def get_video_metadata(video_id):
+    """
+    Fetch video metadata (title, description, tags, etc.).
+
+    Thin projection over get_video_full so /api/metadata, /api/statistics and
+    the unified endpoint share one cache entry per video.
+    """
+    return get_video_full(video_id)['metadata']
+
+def get_video_statistics(video_id):
+    """
+    Fetch video statistics from YouTube Data API v3.
+
+    Args:
+        video_id: YouTube video ID (11 characters)
+
+    Returns:
+        Dictionary with view_count, like_count, comment_count, duration (parsed),
+        definition, and caption status
+
+    Raises:
+        Exception: If video not found or access is forbidden
+    """
+    return get_video_full(video_id)['statistics']
+
+def get_unified_video_data(video_id, include_comments=False, comments_max=COMMENTS_MAX_RESULTS):
     """
     Fetch complete video data (transcript, metadata, statistics) in parallel.
 
-    Uses ThreadPoolExecutor to fetch all three data types concurrently,
-    then aggregates results with error handling for partial failures.
+    Fetches the transcript (and optionally comments) on the shared fetch
+    executor while the combined metadata/statistics videos.list call runs on
+    the calling thread, then aggregates results with error handling for
+    partial failures.
 
     Args:
         video_id: YouTube video ID (11 characters)
+        include_comments: Also fetch top comments (one more quota unit)
+        comments_max: Maximum number of comments when include_comments is set
 
     Returns:
         Dictionary with:
         - success (bool): True if any data fetched successfully
         - partial_success (bool): True if some fetches failed
         - video_id (str): The video ID
-        - quota_cost (int): Total API quota cost (3)
+        - quota_cost (int): Total API quota cost (1, or 2 with comments)
         - transcript (dict/list or None): Transcript data
         - metadata (dict or None): Video metadata
         - statistics (dict or None): Video statistics
+        - comments (list or None): Top comments (only with include_comments)
         - errors (list): List of {field, error} for failed fetches
     """
     # Initialize result structure
@@ -213,49 +1026,62 @@ def get_unified_video_data(video_id):
         'success': True,
         'partial_success': False,
         'video_id': video_id,
-        'quota_cost': 3,
+        'quota_cost': LIST_QUOTA_COST,  # One videos.list call; the transcript costs none
         'transcript': None,
         'metadata': None,
         'statistics': None,
         'errors': []
     }
 
-    # Create fetch functions with video_id bound using functools.partial
-    fetch_functions = {
-        'transcript': functools.partial(get_transcript, video_id),
-        'metadata': functools.partial(get_video_metadata, video_id),
-        'statistics': functools.partial(get_video_statistics, video_id)
-    }
+    # Fetch the transcript on the shared executor while this thread makes the
+    # combined metadata/statistics videos.list call itself, so each request
+    # occupies a single pool thread rather than one per upstream call
+    transcript_future = fetch_executor.submit(get_transcript, video_id)
+    if include_comments:
+        comments_future = fetch_executor.submit(get_comments_for_video, video_id, comments_max)
+        result['comments'] = None
+        result['quota_cost'] += LIST_QUOTA_COST
+    successes = 0
 
-    # Execute fetches in parallel using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        # Submit all fetch functions and store futures
-        futures = {
-            executor.submit(func): field_name
-            for field_name, func in fetch_functions.items()
-        }
+    try:
+        video = get_video_full(video_id)
+        result['metadata'] = video['metadata']
+        result['statistics'] = video['statistics']
+        successes += 1
+    except Exception as e:
+        # Field failed: leave None and record the error
+        for field in ('metadata', 'statistics'):
+            result['errors'].append({
+                'field': field,
+                'error': str(e)
+            })
 
-        # Process completed futures as they finish
-        for future in as_completed(futures):
-            field_name = futures[future]
-            try:
-                result[field_name] = future.result()
-            except Exception as e:
-                # Field failed: store None, log error, mark partial success
-                result[field_name] = None
-                result['errors'].append({
-                    'field': field_name,
-                    'error': str(e)
-                })
-                result['partial_success'] = True
-
-    # If all fetches failed, set success to False
-    if result['errors'] and not any([result['transcript'], result['metadata'], result['statistics']]):
-        result['success'] = False
+    try:
+        result['transcript'] = transcript_to_list(transcript_future.result())
+        successes += 1
+    except Exception as e:
+        result['errors'].append({
+            'field': 'transcript',
+            'error': str(e)
+        })
+
+    if include_comments:
+        try:
+            result['comments'] = comments_future.result()
+            successes += 1
+        except Exception as e:
+            result['errors'].append({
+                'field': 'comments',
+                'error': str(e)
+            })
+
+    # Success if any fetch succeeded (even with an empty payload); partial
+    # success if some succeeded and some failed
+    result['success'] = successes > 0
+    result['partial_success'] = successes > 0 and bool(result['errors'])
 
     return result
 
-@lru_cache(maxsize=100)
 def get_comments_for_video(video_id, max_results=100):
     """
     Fetch comments for a video.
@@ -273,9 +1099,17 @@ def get_comments_for_video(video_id, max_results=100):
     Raises:
         Exception: If comments are disabled or video not found
     """
-    return get_video_comments(video_id, max_results)
+    return comments_to_list(get_video_comments(video_id)[:max_results])
 
-@lru_cache(maxsize=50)
+# Thumbnail sizes in order of preference
+_THUMB_PRIORITY = ('default', 'medium', 'high')
+
+def pick_thumbnail(thumbnails):
+    """Return the URL of the first available thumbnail in _THUMB_PRIORITY order."""
+    return next((thumbnails[size].get('url') for size in _THUMB_PRIORITY if size in thumbnails), None)
+
+@cached(cache=_search_cache, lock=threading.RLock())
+@persistent_cache(expire=_search_cache.ttl)
 def search_youtube_videos(query, max_results=10):
     """
     Search YouTube videos by keyword using YouTube Search API.
@@ -317,9 +1151,10 @@ def search_youtube_videos(query, max_results=10):
             q=query,
             type='video',
             maxResults=max_results,
-            order='relevance'  # Most relevant results first
+            order='relevance',  # Most relevant results first
+            fields=SEARCH_FIELDS
         )
-        search_response = search_request.execute()
+        search_response = execute_request(search_request, quota_cost=SEARCH_QUOTA_COST)
 
         # Extract video data from response
         videos = []
@@ -332,14 +1167,7 @@ def search_youtube_videos(query, max_results=10):
             snippet = item.get('snippet', {})
 
             # Extract thumbnail with fallback
-            thumbnail_url = None
-            thumbnails = snippet.get('thumbnails', {})
-            if 'default' in thumbnails:
-                thumbnail_url = thumbnails['default'].get('url')
-            elif 'medium' in thumbnails:
-                thumbnail_url = thumbnails['medium'].get('url')
-            elif 'high' in thumbnails:
-                thumbnail_url = thumbnails['high'].get('url')
+            thumbnail_url = pick_thumbnail(snippet.get('thumbnails', {}))
 
             videos.append({
                 'video_id': video_id,
@@ -365,7 +1193,8 @@ def search_youtube_videos(query, max_results=10):
     except Exception as e:
         raise e
 
-@lru_cache(maxsize=100)
+@cached(cache=_channel_info_cache, lock=threading.RLock())
+@persistent_cache(expire=_channel_info_cache.ttl)
 def get_channel_info(channel_id):
     """
     Fetch YouTube channel information from YouTube Channels API.
@@ -397,9 +1226,10 @@ def get_channel_info(channel_id):
     try:
         request = youtube.channels().list(
             part='snippet,statistics',
-            id=channel_id
+            id=channel_id,
+            fields=CHANNEL_FIELDS
         )
-        response = request.execute()
+        response = execute_request(request)
 
         # Check if channel was found
         if not response.get('items'):
@@ -410,14 +1240,7 @@ def get_channel_info(channel_id):
         statistics = channel_data.get('statistics', {})
 
         # Extract thumbnail with fallback
-        thumbnail_url = None
-        thumbnails = snippet.get('thumbnails', {})
-        if 'default' in thumbnails:
-            thumbnail_url = thumbnails['default'].get('url')
-        elif 'medium' in thumbnails:
-            thumbnail_url = thumbnails['medium'].get('url')
-        elif 'high' in thumbnails:
-            thumbnail_url = thumbnails['high'].get('url')
+        thumbnail_url = pick_thumbnail(snippet.get('thumbnails', {}))
 
         return {
             'channel_id': channel_data.get('id', channel_id),
@@ -439,7 +1262,8 @@ def get_channel_info(channel_id):
     except Exception as e:
         raise e
 
-@lru_cache(maxsize=50)
+@cached(cache=_channel_uploads_cache, lock=threading.RLock())
+@persistent_cache(expire=_channel_uploads_cache.ttl)
 def get_channel_uploads(channel_id, max_results=10):
     """
     Fetch recent video uploads from a YouTube channel using YouTube Search API.
@@ -471,9 +1295,10 @@ def get_channel_uploads(channel_id, max_results=10):
             channelId=channel_id,
             type='video',
             order='date',  # Most recent first
-            maxResults=max_results
+            maxResults=max_results,
+            fields=SEARCH_FIELDS
         )
-        response = request.execute()
+        response = execute_request(request, quota_cost=SEARCH_QUOTA_COST)
 
         # Extract video data from response
         videos = []
@@ -486,14 +1311,7 @@ def get_channel_uploads(channel_id, max_results=10):
             snippet = item.get('snippet', {})
 
             # Extract thumbnail with fallback
-            thumbnail_url = None
-            thumbnails = snippet.get('thumbnails', {})
-            if 'default' in thumbnails:
-                thumbnail_url = thumbnails['default'].get('url')
-            elif 'medium' in thumbnails:
-                thumbnail_url = thumbnails['medium'].get('url')
-            elif 'high' in thumbnails:
-                thumbnail_url = thumbnails['high'].get('url')
+            thumbnail_url = pick_thumbnail(snippet.get('thumbnails', {}))
 
             videos.append({
                 'video_id': video_id,
@@ -515,18 +1333,33 @@ def get_channel_uploads(channel_id, max_results=10):
     except Exception as e:
         raise e
 
+# YouTube durations are PT#H#M#S, with a day (or rarely week) component for
+# videos longer than a day and P0D for live streams
+_DURATION_RE = re.compile(r'^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+@functools.lru_cache(maxsize=4096)
 def parse_duration(iso_duration):
     """
     Parse ISO 8601 duration string (e.g., PT1H2M3S) into components.
 
+    Results are memoized since the same durations recur across videos;
+    callers must not modify the returned dictionary.
+
     Args:
         iso_duration: ISO 8601 duration string (e.g., "PT1H2M3S")
 
     Returns:
         Dictionary with keys: raw, total_seconds, hours, minutes, seconds
+
+    Raises:
+        ValueError: If the string is not a week/day/time duration
     """
-    duration = isodate.parse_duration(iso_duration)
-    total_seconds = int(duration.total_seconds())
+    match = _DURATION_RE.match(iso_duration)
+    if not match:
+        raise ValueError(f"Unsupported ISO 8601 duration: {iso_duration}")
+
+    weeks, days, hours, minutes, seconds = (int(value) if value else 0 for value in match.groups())
+    total_seconds = ((weeks * 7 + days) * 24 + hours) * 3600 + minutes * 60 + seconds
 
     hours = total_seconds // 3600
     minutes = (total_seconds % 3600) // 60
@@ -540,23 +1373,66 @@ def parse_duration(iso_duration):
         'seconds': seconds
     }
 
-def process_transcript(transcript_list, include_timestamps=True):
-    if include_timestamps:
-        return transcript_list
-    # Combine all text segments into a single string when timestamps=false
-    combined_text = " ".join(item['text'] for item in transcript_list)
-    return {"text": combined_text}
+# Characters allowed in a YouTube video ID
+_VIDEO_ID_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
 
 def is_valid_video_id(video_id):
     # Basic YouTube video ID validation (11 characters, alphanumeric with some special chars)
-    return bool(re.match(r'^[A-Za-z0-9_-]{11}$', video_id))
+    return len(video_id) == 11 and _VIDEO_ID_CHARS.issuperset(video_id)
+
+# Maximum number of distinct URLs kept per cached_json view
+RESPONSE_CACHE_SIZE = 256
+
+def cached_json(ttl):
+    """
+    Cache a view's successful JSON response body and ETag for `ttl` seconds,
+    and let browsers and CDNs cache it as long with Cache-Control.
+
+    Cache hits skip the view and JSON encoding entirely and are not charged
+    against the endpoint's rate limit; requests whose If-None-Match matches
+    the ETag get an empty 304. Only 200 responses are cached; errors and
+    partial results always go through the view.
+    """
+    def decorator(func):
+        cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=ttl)
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = request.full_path
+            with lock:
+                entry = cache.get(key)
+
+            if entry is None:
+                response = app.make_response(func(*args, **kwargs))
+                if response.status_code != 200 or response.mimetype != 'application/json':
+                    return response
+                body = response.get_data()
+                entry = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+                with lock:
+                    cache[key] = entry
+
+            body, etag = entry
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = Response(body, mimetype='application/json')
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = ttl
+            return response
+        wrapper.response_cache = cache
+        wrapper.response_cache_lock = lock
+        return wrapper
+    return decorator
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/api/transcript/<video_id>', methods=['GET'])
-@limiter.limit("10 per minute")
+@rate_limit("10 per minute")
+@cached_json(ttl=86400)
 def transcript(video_id):
     try:
         if not is_valid_video_id(video_id):
@@ -567,8 +1443,11 @@ def transcript(video_id):
         # Get timestamps parameter (default to True)
         include_timestamps = request.args.get('timestamps', 'true').lower() == 'true'
         
-        transcript_list = get_transcript(video_id)
-        processed_transcript = process_transcript(transcript_list, include_timestamps)
+        if include_timestamps:
+            processed_transcript = transcript_to_list(get_transcript(video_id))
+        else:
+            # Combine all text segments into a single string when timestamps=false
+            processed_transcript = {"text": get_transcript_text(video_id)}
         
         return jsonify({
             'success': True,
@@ -618,7 +1497,8 @@ def transcript(video_id):
         }), 500
 
 @app.route('/api/comments/<video_id>', methods=['GET'])
-@limiter.limit("10 per minute")
+@rate_limit("10 per minute")
+@cached_json(ttl=300)
 def comments(video_id):
     try:
         if not is_valid_video_id(video_id):
@@ -626,17 +1506,35 @@ def comments(video_id):
                 'error': 'Invalid video ID format'
             }), 400
 
-        # Get max_results parameter (default to 100, max 100)
-        max_results = min(int(request.args.get('max_results', 100)), 100)
+        # Get pages parameter (default to 1, clamped to 1-5)
+        pages = request.args.get('pages', default=1, type=int)
+        pages = max(1, min(pages, COMMENTS_MAX_PAGES))
 
-        comments_list = get_video_comments(video_id, max_results)
+        # Get max_results parameter (default to 100 per page, clamped to 1-100 per page)
+        max_results = request.args.get('max_results', default=COMMENTS_MAX_RESULTS * pages, type=int)
+        max_results = max(1, min(max_results, COMMENTS_MAX_RESULTS * pages))
 
-        return jsonify({
+        # Every max_results shares the cached comments for the page count
+        if pages == 1:
+            comments_list = get_video_comments(video_id)[:max_results]
+            truncated = False
+        else:
+            comments_list, truncated = get_all_video_comments(video_id, pages)
+            comments_list = comments_list[:max_results]
+
+        result = {
             'success': True,
             'video_id': video_id,
             'comment_count': len(comments_list),
+            'truncated': truncated,
             'comments': comments_list
-        })
+        }
+
+        # A later page failed; 207 keeps the short list out of response caches
+        if truncated:
+            return jsonify(result), 207  # Multi-Status
+
+        return jsonify(result)
 
     except Exception as e:
         error_message = str(e)
@@ -655,7 +1553,8 @@ def comments(video_id):
             }), 500
 
 @app.route('/api/metadata/<video_id>', methods=['GET'])
-@limiter.limit("10 per minute")
+@rate_limit("10 per minute")
+@cached_json(ttl=300)
 def metadata(video_id):
     try:
         if not is_valid_video_id(video_id):
@@ -690,7 +1589,8 @@ def metadata(video_id):
             }), 500
 
 @app.route('/api/statistics/<video_id>', methods=['GET'])
-@limiter.limit("10 per minute")
+@rate_limit("10 per minute")
+@cached_json(ttl=300)
 def statistics(video_id):
     """
     Endpoint to fetch video statistics.
@@ -739,7 +1639,8 @@ def statistics(video_id):
             }), 500
 
 @app.route('/api/video/<video_id>', methods=['GET'])
-@limiter.limit("10 per minute")
+@rate_limit("10 per minute")
+@cached_json(ttl=300)
 def unified_video_data(video_id):
     """
     Unified endpoint to fetch complete video data (transcript, metadata, statistics) in parallel.
@@ -749,7 +1650,7 @@ def unified_video_data(video_id):
         - success (bool): True if any data fetched successfully
         - partial_success (bool): True if some fetches failed
         - video_id (str): The video ID
-        - quota_cost (int): Total API quota cost (3)
+        - quota_cost (int): Total API quota cost (1)
         - transcript: Video transcript with timestamps
         - metadata: Video metadata (title, description, tags, etc.)
         - statistics: Video statistics (views, likes, comments, duration)
@@ -789,6 +1690,69 @@ def unified_video_data(video_id):
             'details': str(e)
         }), 500
 
+@app.route('/api/videos', methods=['GET'])
+@rate_limit("10 per minute")
+@cached_json(ttl=300)
+def videos_bulk():
+    """
+    Endpoint to fetch metadata and statistics for several videos at once.
+
+    Query parameters:
+        ids: Comma-separated list of video IDs (up to 250)
+
+    Returns:
+        JSON with success, quota_cost (1 per 50 IDs), videos keyed by
+        video_id (each with metadata and statistics), and not_found IDs.
+
+    Error responses:
+        400: Missing or invalid video IDs
+        403: Access forbidden (quota exceeded or invalid API key)
+        500: Unexpected error
+    """
+    try:
+        video_ids = list(dict.fromkeys(
+            video_id.strip() for video_id in request.args.get('ids', '').split(',') if video_id.strip()
+        ))
+
+        if not video_ids:
+            return jsonify({
+                'error': 'No video IDs provided'
+            }), 400
+
+        if len(video_ids) > BULK_MAX_IDS:
+            return jsonify({
+                'error': f'Too many video IDs (max {BULK_MAX_IDS})'
+            }), 400
+
+        invalid_ids = [video_id for video_id in video_ids if not is_valid_video_id(video_id)]
+        if invalid_ids:
+            return jsonify({
+                'error': 'Invalid video ID format',
+                'details': invalid_ids
+            }), 400
+
+        videos_data = get_videos_bulk(video_ids)
+
+        return jsonify({
+            'success': True,
+            'quota_cost': (len(video_ids) + VIDEOS_LIST_MAX_IDS - 1) // VIDEOS_LIST_MAX_IDS,
+            'videos': {video_id: videos_data[video_id] for video_id in video_ids if video_id in videos_data},
+            'not_found': [video_id for video_id in video_ids if video_id not in videos_data]
+        })
+
+    except Exception as e:
+        error_message = str(e)
+        if "Access forbidden" in error_message:
+            return jsonify({
+                'error': 'Access forbidden',
+                'details': 'Quota may be exceeded or API key is invalid'
+            }), 403
+        else:
+            return jsonify({
+                'error': 'An unexpected error occurred',
+                'details': error_message
+            }), 500
+
 @app.route('/health')
 def health():
     """
@@ -802,7 +1766,7 @@ def health():
         "service": "YouTube Data Fetcher API",
         "flask": "running",
         "rest_api": "available at /api/*",
-        "mcp_server": "available at /mcp/* (proxied)",
+        "mcp_server": "available at /mcp/* (in-process)" if app.config.get('MCP_IN_PROCESS') else "available at /mcp/* (proxied)",
         "mcp_tools": "analyze_video, search_youtube_content, get_channel_overview"
     })
 
@@ -820,62 +1784,121 @@ def ratelimit_handler(e):
 
 logger.info("Initializing MCP server proxy...")
 
+# Keep-alive connection pool to the internal MCP server, shared by all
+# proxied requests. Connection failures are retried once (the server may
+# still be binding its port); YouTube API operations can take 60+ seconds
+_mcp_client = httpx.Client(
+    base_url='http://127.0.0.1:8000',
+    timeout=120,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128, keepalive_expiry=60),
+    transport=httpx.HTTPTransport(retries=1)
+)
+atexit.register(_mcp_client.close)
+
+# Hop-by-hop and proxy headers (lowercase) not forwarded to the MCP server,
+# and upstream response headers not copied back to the client
+_SKIP_REQUEST_HEADERS = frozenset({
+    'host', 'x-forwarded-proto', 'x-forwarded-host', 'x-forwarded-for',
+    'x-forwarded-port', 'forwarded', 'connection'
+})
+_EXCLUDED_RESPONSE_HEADERS = frozenset({
+    'content-encoding', 'content-length', 'transfer-encoding', 'connection'
+})
+
+# Static CORS preflight response headers; Max-Age lets clients cache the
+# preflight for a day
+_CORS_PREFLIGHT_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Max-Age': '86400'
+}
+
 # Global state for MCP server
-_mcp_server_thread = None
-_mcp_server_started = False
+_mcp_server_process = None
+_mcp_server_up = False  # This worker's or another worker's server accepts connections
 _mcp_startup_lock = threading.Lock()
 
 
-def run_mcp_server():
-    """Run the MCP server on localhost (internal only)."""
+def start_mcp_server():
+    """
+    Start the MCP server on localhost (internal only) in its own process, so
+    it does not share a GIL with Flask request handling.
+    """
+    logger.info("Starting uvicorn on 127.0.0.1:8000...")
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'uvicorn', 'mcp_server:create_mcp_app', '--factory',
+            '--host', '127.0.0.1', '--port', '8000',
+            '--timeout-keep-alive', '120', '--log-level', 'warning'
+        ],
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    atexit.register(process.terminate)
+    return process
+
+
+def mcp_server_accepting():
+    """Return True if something is accepting connections on the MCP port."""
     try:
-        logger.info("MCP server thread starting...")
-        from mcp_server import create_mcp_app
-        mcp_app = create_mcp_app()
-        import uvicorn
-        logger.info("Starting uvicorn on 127.0.0.1:8000...")
-        uvicorn.run(
-            mcp_app,
-            host="127.0.0.1",
-            port=8000,
-            log_level="info",
-            access_log=True,
-            timeout_keep_alive=120
-        )
-        logger.info("Uvicorn shutdown gracefully")
-    except Exception as e:
-        logger.error(f"MCP server crashed: {e}", exc_info=True)
-        import traceback
-        logger.error(traceback.format_exc())
+        socket.create_connection(('127.0.0.1', 8000), timeout=0.01).close()
+        return True
+    except OSError:
+        return False
 
 
 def ensure_mcp_server_running():
     """Ensure MCP server is running (called on first request)."""
-    global _mcp_server_thread, _mcp_server_started
+    global _mcp_server_process, _mcp_server_up
+
+    # Fast path: no lock or probe once the server is known to be up, unless
+    # this worker owns it and it has exited
+    if _mcp_server_up and (_mcp_server_process is None or _mcp_server_process.poll() is None):
+        return
 
     with _mcp_startup_lock:
-        if not _mcp_server_started:
+        if _mcp_server_up and (_mcp_server_process is None or _mcp_server_process.poll() is None):
+            return
+
+        # Under a multi-worker WSGI server, the first worker to get an /mcp
+        # request owns the server; the others proxy to it rather than
+        # spawning duplicates that fail to bind the port
+        if mcp_server_accepting():
+            # Drop our handle if our own server lost the port to another worker's
+            if _mcp_server_process is not None and _mcp_server_process.poll() is not None:
+                _mcp_server_process = None
+            _mcp_server_up = True
+            return
+
+        if _mcp_server_process is not None:
+            logger.error(f"MCP server exited with code {_mcp_server_process.returncode}, restarting...")
+        else:
             logger.info("Starting MCP server on-demand...")
-            _mcp_server_thread = threading.Thread(target=run_mcp_server, daemon=True)
-            _mcp_server_thread.start()
-            _mcp_server_started = True
-
-            # Wait for server to be ready with health check
-            logger.info("Waiting for MCP server to be ready...")
-            max_retries = 10
-            for i in range(max_retries):
-                try:
-                    resp = requests.get("http://127.0.0.1:8000/health", timeout=1)
-                    if resp.status_code == 200:
-                        logger.info("MCP server is ready!")
-                        return
-                except:
-                    if i < max_retries - 1:
-                        logger.debug(f"Health check attempt {i+1} failed, retrying...")
-                        time.sleep(0.5)
-                    else:
-                        logger.error("MCP server failed to start after multiple attempts")
-                        raise Exception("MCP server failed to start")
+        _mcp_server_up = False
+        _mcp_server_process = start_mcp_server()
+
+        # Poll the port until uvicorn accepts connections, so the first
+        # request waits only as long as startup actually takes
+        logger.info("Waiting for MCP server to be ready...")
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if mcp_server_accepting():
+                logger.info("MCP server is ready!")
+                _mcp_server_up = True
+                return
+            if _mcp_server_process.poll() is not None:
+                break
+            time.sleep(0.01)
+
+        # Our process may have exited because another worker's server won
+        # the port while it was starting
+        if mcp_server_accepting():
+            logger.info("MCP server is ready (started by another worker)")
+            _mcp_server_process = None
+            _mcp_server_up = True
+            return
+        logger.error("MCP server failed to start")
+        raise Exception("MCP server failed to start")
 
 
 @app.route('/mcp', methods=['GET', 'POST', 'OPTIONS'])
@@ -887,97 +1910,78 @@ def proxy_mcp(path=''):
     MCP endpoints are available at /mcp/* and are proxied to
     the internal MCP server running on localhost:8000.
     """
-    logger.info(f"MCP proxy request: {request.method} /mcp/{path}")
+    global _mcp_server_up
+    method = request.method
+    logger.info(f"MCP proxy request: {method} /mcp/{path}")
 
-    # Check if MCP server thread is still alive
-    if _mcp_server_thread and not _mcp_server_thread.is_alive():
-        logger.error("MCP server thread is dead! Marking for restart...")
-        global _mcp_server_started
-        _mcp_server_started = False
+    # Answer CORS preflights directly; they never need the MCP server. The
+    # route only admits GET, POST and OPTIONS, so the rest is GET or POST
+    if method == 'OPTIONS':
+        return '', 204, _CORS_PREFLIGHT_HEADERS
 
-    # Ensure MCP server is running before proxying
-    ensure_mcp_server_running()
+    # Ensure MCP server is running (restarting it if it exited) before proxying
+    try:
+        ensure_mcp_server_running()
+    except Exception as e:
+        return jsonify({"error": "MCP server not available", "detail": str(e)}), 502
 
     # Get the internal MCP server URL
     path_suffix = f"/{path}" if path else ""
-    mcp_url = f"http://127.0.0.1:8000/mcp{path_suffix}"
-    logger.debug(f"Proxying to: {mcp_url}")
-
-    # Forward the request to the MCP server
-    if request.method == 'OPTIONS':
-        logger.info("Handling CORS preflight request")
-        response = jsonify({"status": "ok"})
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-        return response
-
-    elif request.method in ['GET', 'POST']:
-        # Build URL with query string if present
-        if request.args:
-            query_string = urlencode(request.args)
-            full_url = f"{mcp_url}?{query_string}"
-        else:
-            full_url = mcp_url
+    mcp_path = f"/mcp{path_suffix}"
+    logger.debug(f"Proxying to: {mcp_path}")
 
-        # Filter headers to avoid protocol issues
-        filtered_headers = {}
-        skip_headers = {'Host', 'X-Forwarded-Proto', 'X-Forwarded-Host',
-                       'X-Forwarded-For', 'X-Forwarded-Port', 'Forwarded'}
-        for key, value in request.headers:
-            if key not in skip_headers:
-                filtered_headers[key] = value
+    # Forward the raw query string as-is; it is already percent-encoded
+    query_string = request.query_string
+    full_url = f"{mcp_path}?{query_string.decode('latin-1')}" if query_string else mcp_path
 
-        try:
-            logger.info(f"Forwarding {request.method} request to MCP server")
-            import time
-            start_time = time.time()
-
-            # Forward GET/POST requests with extended timeout
-            # YouTube API operations can take 60+ seconds
-            resp = requests.request(
-                method=request.method,
-                url=full_url,
-                headers=filtered_headers,
-                data=request.get_data(),
-                timeout=120  # Increased from 30 to 120 seconds
-            )
+    # Filter headers to avoid protocol issues
+    filtered_headers = {key: value for key, value in request.headers
+                        if key.lower() not in _SKIP_REQUEST_HEADERS}
 
-            elapsed = time.time() - start_time
-            logger.info(f"MCP server responded: {resp.status_code} (took {elapsed:.1f}s)")
-
-            # Create Flask response from MCP server response
-            excluded_headers = ['content-encoding', 'content-length', 'transfer-encoding', 'connection']
-            headers = [(name, value) for (name, value) in resp.raw.headers.items()
-                       if name.lower() not in excluded_headers]
-
-            # Try to parse JSON response, otherwise use raw content
-            if resp.content:
-                try:
-                    response = jsonify(resp.json())
-                except:
-                    # Not JSON, return raw content
-                    response = Response(resp.content, resp.status_code)
-            else:
-                # Empty response
-                response = Response('', resp.status_code)
+    try:
+        logger.info(f"Forwarding {method} request to MCP server")
+        start_time = time.time()
+
+        # GETs carry no body, and POST bodies are read once without being
+        # kept on the request
+        upstream = _mcp_client.build_request(
+            method,
+            full_url,
+            headers=filtered_headers,
+            content=None if method == 'GET' else request.get_data(cache=False)
+        )
+        resp = _mcp_client.send(upstream, stream=True)
 
-            response.status_code = resp.status_code
-            for name, value in headers:
-                response.headers[name] = value
-            return response
+        elapsed = time.time() - start_time
+        logger.info(f"MCP server responded: {resp.status_code} (took {elapsed:.1f}s)")
 
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"MCP server connection error: {e}")
-            return jsonify({"error": "MCP server not available", "detail": str(e)}), 502
-        except requests.exceptions.Timeout as e:
-            logger.error(f"MCP server timeout: {e}")
-            return jsonify({"error": "MCP server timeout", "detail": str(e)}), 504
-        except Exception as e:
-            logger.error(f"MCP proxy error: {e}", exc_info=True)
-            return jsonify({"error": "MCP proxy error", "detail": str(e)}), 500
+        # Create Flask response from MCP server response
+        headers = [(name, value) for (name, value) in resp.headers.multi_items()
+                   if name not in _EXCLUDED_RESPONSE_HEADERS]
 
-    return jsonify({"error": "Method not allowed"}), 405
+        # Stream the body through as it arrives rather than buffering it,
+        # so SSE (text/event-stream) responses reach the client immediately.
+        # The body is decoded because content-encoding is not forwarded.
+        def generate():
+            try:
+                yield from resp.iter_bytes(64 * 1024)
+            finally:
+                resp.close()
+
+        return Response(generate(), status=resp.status_code, headers=headers, direct_passthrough=True)
+
+    except httpx.ConnectError as e:
+        logger.error(f"MCP server connection error: {e}")
+        # Probe (and restart if needed) on the next request; the server may
+        # have belonged to a worker that has since exited
+        _mcp_server_up = False
+        return jsonify({"error": "MCP server not available", "detail": str(e)}), 502
+    except httpx.TimeoutException as e:
+        logger.error(f"MCP server timeout: {e}")
+        return jsonify({"error": "MCP server timeout", "detail": str(e)}), 504
+    except Exception as e:
+        logger.error(f"MCP proxy error: {e}", exc_info=True)
+        return jsonify({"error": "MCP proxy error", "detail": str(e)}), 500
 
 
 logger.info("MCP proxy routes registered successfully")
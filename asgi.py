@@ -0,0 +1,56 @@
+"""
+ASGI application serving the Flask REST API and the MCP server together.
+
+Requests to /mcp go straight to the FastMCP ASGI app in-process, with no
+loopback proxy hop; everything else goes to Flask on a thread pool. Run with:
+
+    uvicorn asgi:asgi --host 0.0.0.0 --port $PORT
+"""
+
+from a2wsgi import WSGIMiddleware
+from app import app, consume_rate_limit, _CORS_PREFLIGHT_HEADERS
+from mcp_server import create_mcp_app
+from starlette.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+import os
+
+# Flask runs on a pool of threads inside the ASGI server; the MCP server is
+# native ASGI and runs on the event loop
+flask_app = WSGIMiddleware(app, workers=int(os.environ.get('WSGI_THREADS', 16)))
+mcp_app = create_mcp_app()
+# Lets Flask's /health report that MCP is served here rather than proxied
+app.config['MCP_IN_PROCESS'] = True
+
+# MCP requests share the per-client rate limit buckets of the Flask /mcp
+# proxy view, since each tool call can spend YouTube quota
+MCP_RATE_LIMIT_ENDPOINT = 'proxy_mcp'
+
+
+async def asgi(scope, receive, send):
+    """
+    Dispatch /mcp and /mcp/* to the MCP server and everything else to Flask.
+
+    Lifespan events go to the MCP server, which needs them to start and stop
+    its session manager. MCP requests are charged against the client's rate
+    limit here, as Flask's before_request hook never sees them. CORS
+    preflights are answered here, as the Flask proxy view does, and are not
+    charged.
+    """
+    if scope['type'] == 'lifespan':
+        await mcp_app(scope, receive, send)
+    elif scope['path'] == '/mcp' or scope['path'].startswith('/mcp/'):
+        if scope['method'] == 'OPTIONS':
+            # The MCP app answers preflights with 405
+            response = Response(status_code=204, headers=_CORS_PREFLIGHT_HEADERS)
+            await response(scope, receive, send)
+            return
+        client = scope['client'][0] if scope.get('client') else None
+        # Redis round-trips and bucket locks block, so keep them off the loop
+        exceeded = await run_in_threadpool(consume_rate_limit, MCP_RATE_LIMIT_ENDPOINT, client)
+        if exceeded is not None:
+            response = JSONResponse({'error': 'Rate limit exceeded', 'details': exceeded}, status_code=429)
+            await response(scope, receive, send)
+            return
+        await mcp_app(scope, receive, send)
+    else:
+        await flask_app(scope, receive, send)
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration for production deployments.
+
+Runs the single ASGI application from asgi.py (REST API and MCP server) under
+uvicorn workers:
+
+    gunicorn -c gunicorn.conf.py
+"""
+
+import os
+
+wsgi_app = "asgi:asgi"
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Each worker runs an event loop for the MCP server and a thread pool for
+# Flask, so one worker handles many concurrent upstream YouTube calls. The
+# outbound YouTube quota budget is per process, so more workers multiply it
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Import the app (and build the YouTube client) once in the master so
+# workers share it copy-on-write
+preload_app = True
+
+# YouTube API operations behind MCP tools can take 60+ seconds
+timeout = 120
+graceful_timeout = 30
+keepalive = 120
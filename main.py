@@ -1,17 +1,24 @@
 """
 Main entry point for the YouTube Data Fetcher application.
 
-This module starts the Flask REST API and MCP Server in a single process
-for deployment on Railway (single-port architecture).
+This module serves the Flask REST API and the MCP Server from the single ASGI
+application in asgi.py on one port for deployment on Railway (single-port
+architecture).
 """
 
-from app import app
 import os
+import uvicorn
 
 if __name__ == "__main__":
     # Get port from Railway environment variable, or default to 5000 for local dev
     port = int(os.environ.get('PORT', 5000))
 
-    # Run Flask app on Railway's PORT (publicly accessible)
-    # The MCP proxy is now in app.py and starts on-demand
-    app.run(host="0.0.0.0", port=port)
+    # uvicorn picks uvloop and httptools automatically when they are installed.
+    # Each worker process has its own caches and rate limit buckets.
+    uvicorn.run(
+        "asgi:asgi",
+        host="0.0.0.0",
+        port=port,
+        workers=int(os.environ.get('WEB_CONCURRENCY', 1)),
+        timeout_keep_alive=120
+    )
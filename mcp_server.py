@@ -7,24 +7,29 @@ to AI agents through a streamable HTTP interface.
 """
 
 from fastmcp import FastMCP
-from starlette.requests import Request
-from starlette.responses import PlainTextResponse
 from starlette.middleware import Middleware
+import asyncio
+import functools
 import re
+import threading
 import time
 import hashlib
 import json
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List, Any, Dict, Callable
-from app import get_unified_video_data, get_comments_for_video, is_valid_video_id, search_youtube_videos, get_channel_info, get_channel_uploads
+from cachetools import TTLCache
+from pydantic import Field
+from typing import Optional, List, Any, Dict, Callable, Annotated
+from typing_extensions import TypedDict, NotRequired
+from app import get_unified_video_data, is_valid_video_id, search_youtube_videos, get_channel_info, get_channel_uploads
 
 
 # ============================================================================
 # Simple in-memory cache for MCP tool results
 # ============================================================================
 
-_mcp_cache = {}
 _cache_ttl = 3600  # Cache results for 1 hour
+_partial_cache_ttl = 30  # Retry partial results sooner
+_mcp_cache = TTLCache(maxsize=1024, ttl=_cache_ttl)
+_mcp_cache_lock = threading.Lock()
 
 
 def _cache_key(tool_name: str, **kwargs) -> str:
@@ -37,23 +42,25 @@ def _cache_key(tool_name: str, **kwargs) -> str:
 def _cache_get(tool_name: str, **kwargs) -> Optional[Any]:
     """Get cached result if available and not expired."""
     key = _cache_key(tool_name, **kwargs)
-    if key in _mcp_cache:
-        cached = _mcp_cache[key]
-        if time.time() - cached["timestamp"] < _cache_ttl:
+    with _mcp_cache_lock:
+        cached = _mcp_cache.get(key)
+        if cached is None:
+            return None
+        if time.monotonic() < cached["expires"]:
             return cached["data"]
-        else:
-            # Expired, remove it
-            del _mcp_cache[key]
+        # Expired (shorter TTL than the cache's own), remove it
+        del _mcp_cache[key]
     return None
 
 
-def _cache_set(tool_name: str, data: Any, **kwargs):
-    """Cache a result with current timestamp."""
+def _cache_set(tool_name: str, data: Any, ttl: int = _cache_ttl, **kwargs):
+    """Cache a result for ttl seconds (at most _cache_ttl)."""
     key = _cache_key(tool_name, **kwargs)
-    _mcp_cache[key] = {
-        "data": data,
-        "timestamp": time.time()
-    }
+    with _mcp_cache_lock:
+        _mcp_cache[key] = {
+            "data": data,
+            "expires": time.monotonic() + ttl
+        }
 
 
 class N8NParameterFilterMiddleware:
@@ -134,25 +141,45 @@ class N8NParameterFilterMiddleware:
 mcp = FastMCP("YouTube Data Fetcher")
 
 
-# Pydantic models for MCP tool inputs with extra='ignore' to handle n8n metadata
-class AnalyzeVideoInput(BaseModel):
-    model_config = ConfigDict(extra='ignore')
+def run_in_thread(func: Callable) -> Callable:
+    """
+    Wrap a blocking tool function as a coroutine that runs it on a worker thread.
 
-    video_url_or_id: str
+    FastMCP calls sync tools directly on the event loop, so one slow YouTube
+    fetch would stall every other MCP request in the process.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return wrapper
 
 
-class SearchYouTubeContentInput(BaseModel):
-    model_config = ConfigDict(extra='ignore')
+# TypedDicts for MCP tool inputs. Pydantic validates them into plain dicts
+# (no model instance per call) and ignores extra keys such as n8n metadata
+class AnalyzeVideoInput(TypedDict):
+    video_url_or_id: str
 
-    query: str
-    max_results: Optional[int] = 10
 
+class SearchYouTubeContentInput(TypedDict):
+    query: str
+    max_results: NotRequired[Annotated[Optional[int], Field(default=10)]]
 
-class GetChannelOverviewInput(BaseModel):
-    model_config = ConfigDict(extra='ignore')
 
+class GetChannelOverviewInput(TypedDict):
     channel_url_or_id: str
-    max_uploads: Optional[int] = 10
+    max_uploads: NotRequired[Annotated[Optional[int], Field(default=10)]]
+
+
+# Longest input searched with _VIDEO_ID_RE (real YouTube URLs are far shorter)
+_MAX_URL_LENGTH = 2048
+
+# Substrings directly followed by the video ID in common URL shapes
+_YOUTUBE_COM_MARKERS = ('?v=', '&v=', '/embed/')
+_YOUTU_BE_MARKERS = ('youtu.be/',)
+
+# Matches youtube.com/watch?v=ID, youtu.be/ID, youtube.com/embed/ID, etc.,
+# capturing exactly the 11 characters allowed in a video ID
+_VIDEO_ID_RE = re.compile(r'(?:youtube\.com\/(?:[^\/]+\/.+\/|(?:v|e(?:mbed)?)\/|.*[?&]v=)|youtu\.be\/)([A-Za-z0-9_-]{11})')
 
 
 def extract_video_id(video_url_or_id: str) -> str:
@@ -172,15 +199,29 @@ def extract_video_id(video_url_or_id: str) -> str:
     if is_valid_video_id(video_url_or_id):
         return video_url_or_id
 
-    # Try to extract from YouTube URL using regex
-    # Pattern matches: youtube.com/watch?v=ID, youtu.be/ID, youtube.com/embed/ID, etc.
-    pattern = r'(?:youtube\.com\/(?:[^\/]+\/.+\/|(?:v|e(?:mbed)?)\/|.*[?&]v=)|youtu\.be\/)([^"&?\/\s]{11})'
-    match = re.search(pattern, video_url_or_id)
-
+    # Both youtube.com and youtu.be contain "youtu", so anything else is
+    # rejected without further work
+    if 'youtu' not in video_url_or_id:
+        match = None
+    else:
+        # Fast paths for the common shapes (watch?v=, youtu.be/, /embed/):
+        # take the 11 characters after the marker if they form a valid ID
+        markers = _YOUTUBE_COM_MARKERS if 'youtube.com/' in video_url_or_id else _YOUTU_BE_MARKERS
+        for marker in markers:
+            index = video_url_or_id.find(marker)
+            if index != -1:
+                start = index + len(marker)
+                candidate = video_url_or_id[start:start + 11]
+                if is_valid_video_id(candidate):
+                    return candidate
+
+        # Fall back to the full regex for the rarer URL forms. Its .* branches
+        # backtrack quadratically, so overlong input never reaches it
+        match = _VIDEO_ID_RE.search(video_url_or_id) if len(video_url_or_id) <= _MAX_URL_LENGTH else None
+
+    # The capture group only matches is_valid_video_id's alphabet
     if match:
-        video_id = match.group(1)
-        if is_valid_video_id(video_id):
-            return video_id
+        return match.group(1)
 
     raise ValueError(
         f"Could not extract valid video ID from: {video_url_or_id}. "
@@ -188,18 +229,43 @@ def extract_video_id(video_url_or_id: str) -> str:
     )
 
 
-@mcp.custom_route("/health", methods=["GET"])
-def health_check(request: Request) -> PlainTextResponse:
-    """
-    Health check endpoint for the MCP server.
-
-    Returns:
-        PlainTextResponse: "OK" if server is healthy
-    """
-    return PlainTextResponse("OK")
+# Result scaffolds for each tool, shallow-copied per call. Mutable fields are
+# None here and replaced with fresh lists on the copy
+_ANALYZE_VIDEO_RESULT = {
+    'success': True,
+    'video_id': None,
+    'transcript': None,
+    'metadata': None,
+    'statistics': None,
+    'comments': None,
+    'partial_success': False,
+    'quota_cost': 2,  # transcript=0, metadata+stats=1 (one videos.list), comments=1
+    'cache_hit': False,
+    'errors': None
+}
+_SEARCH_RESULT = {
+    'success': False,
+    'query': None,
+    'result_count': 0,
+    'quota_cost': 100,  # Search API is expensive!
+    'videos': None,
+    'workflow_hint': 'Use analyze_video() with these video IDs to get complete transcript, metadata, statistics, and comments.',
+    'error': None
+}
+_CHANNEL_OVERVIEW_RESULT = {
+    'success': False,
+    'channel': None,
+    'uploads': None,
+    'upload_count': 0,
+    'quota_cost': 101,  # 1 for channel info, 100 for uploads search
+    'cache_hit': False,
+    'workflow_hint': 'Use analyze_video() with upload video IDs to get complete transcript, metadata, statistics, and comments.',
+    'error': None
+}
 
 
 @mcp.tool()
+@run_in_thread
 def analyze_video(inputs: AnalyzeVideoInput) -> dict:
     """
     Fetch complete YouTube video data including transcript, metadata, statistics, and comments.
@@ -218,97 +284,69 @@ def analyze_video(inputs: AnalyzeVideoInput) -> dict:
         - statistics (dict or None): Video statistics (views, likes, duration, etc.)
         - comments (list or None): Top comments from the video
         - partial_success (bool): True if some data failed to fetch
-        - quota_cost (int): Total API quota cost (4)
+        - quota_cost (int): Total API quota cost (2, or 0 when cached)
+        - cache_hit (bool): True if served from the tool result cache
         - errors (list): List of {field, error} for any failed fetches
     """
     # Extract video_url_or_id from inputs (ignores extra n8n parameters)
-    video_url_or_id = inputs.video_url_or_id
-
-    # Check cache first
-    cached = _cache_get("analyze_video", video_url_or_id=video_url_or_id)
-    if cached is not None:
-        return cached
+    video_url_or_id = inputs['video_url_or_id']
 
     # Extract and validate video ID
     try:
         video_id = extract_video_id(video_url_or_id)
     except ValueError as e:
-        return {
-            'success': False,
-            'video_id': None,
-            'transcript': None,
-            'metadata': None,
-            'statistics': None,
-            'comments': None,
-            'partial_success': False,
-            'quota_cost': 0,
-            'errors': [{'field': 'video_id', 'error': str(e)}]
-        }
+        result = _ANALYZE_VIDEO_RESULT.copy()
+        result['success'] = False
+        result['quota_cost'] = 0
+        result['errors'] = [{'field': 'video_id', 'error': str(e)}]
+        return result
+
+    # Check cache first (keyed by ID so URL variants of one video share an entry)
+    cached = _cache_get("analyze_video", video_id=video_id)
+    if cached is not None:
+        return {**cached, 'quota_cost': 0, 'cache_hit': True}
 
     # Initialize result structure
-    result = {
-        'success': True,
-        'video_id': video_id,
-        'transcript': None,
-        'metadata': None,
-        'statistics': None,
-        'comments': None,
-        'partial_success': False,
-        'quota_cost': 4,  # transcript=0, metadata=1, stats=1, comments=2 (for threads)
-        'errors': []
-    }
-
-    # Fetch transcript, metadata, statistics in parallel (via get_unified_video_data)
+    result = _ANALYZE_VIDEO_RESULT.copy()
+    result['video_id'] = video_id
+    result['errors'] = []
+
+    # One unified fetch runs transcript, videos.list and comments concurrently;
+    # a failure in any of them is reported per field rather than failing the call
     try:
-        unified_data = get_unified_video_data(video_id)
+        unified_data = get_unified_video_data(video_id, include_comments=True, comments_max=100)
 
         # Extract data from unified response
         result['transcript'] = unified_data.get('transcript')
         result['metadata'] = unified_data.get('metadata')
         result['statistics'] = unified_data.get('statistics')
+        result['comments'] = unified_data.get('comments')
 
         # Merge errors from unified fetch
         if unified_data.get('errors'):
             result['errors'].extend(unified_data['errors'])
             result['partial_success'] = True
 
-        # Update quota_cost base (3 for unified data)
-        result['quota_cost'] = unified_data.get('quota_cost', 3)
+        result['quota_cost'] = unified_data.get('quota_cost', 2)
 
     except Exception as e:
         result['errors'].append({'field': 'unified_data', 'error': str(e)})
         result['partial_success'] = True
 
-    # Fetch comments separately (not in unified endpoint)
-    try:
-        comments = get_comments_for_video(video_id, max_results=100)
-        result['comments'] = comments
-        result['quota_cost'] += 1  # Add 1 for comments (threads endpoint)
-
-    except Exception as e:
-        # Comments failure shouldn't fail the entire request
-        result['comments'] = None
-        result['errors'].append({'field': 'comments', 'error': str(e)})
-        result['partial_success'] = True
-
     # Check if all fetches failed
-    has_any_data = any([
-        result['transcript'] is not None,
-        result['metadata'] is not None,
-        result['statistics'] is not None,
-        result['comments'] is not None
-    ])
-
-    if not has_any_data:
+    if (result['transcript'] is None and result['metadata'] is None
+            and result['statistics'] is None and result['comments'] is None):
         result['success'] = False
 
-    # Cache the result
-    _cache_set("analyze_video", result, video_url_or_id=video_url_or_id)
+    # Cache the result (briefly if some fetches failed, so they are retried soon)
+    ttl = _partial_cache_ttl if result['partial_success'] else _cache_ttl
+    _cache_set("analyze_video", result, ttl=ttl, video_id=video_id)
 
     return result
 
 
 @mcp.tool()
+@run_in_thread
 def search_youtube_content(inputs: SearchYouTubeContentInput) -> dict:
     """
     Search YouTube videos by keyword. WARNING: Expensive operation (100 YouTube API quota units).
@@ -336,34 +374,20 @@ def search_youtube_content(inputs: SearchYouTubeContentInput) -> dict:
         - error (str): Error message if search failed
     """
     # Extract parameters from inputs (ignores extra n8n parameters)
-    query = inputs.query
-    max_results = inputs.max_results or 10
+    query = inputs['query']
+
+    # Clamp max_results to 1-50 (the input schema already guarantees an int)
+    max_results = max(1, min(50, inputs.get('max_results') or 10))
 
     # Check cache first
     cached = _cache_get("search_youtube_content", query=query, max_results=max_results)
     if cached is not None:
         return cached
 
-    # Validate max_results parameter
-    try:
-        max_results = int(max_results)
-        if max_results < 1:
-            max_results = 1
-        elif max_results > 50:
-            max_results = 50
-    except (ValueError, TypeError):
-        max_results = 10
-
     # Initialize result structure
-    result = {
-        'success': False,
-        'query': query,
-        'result_count': 0,
-        'quota_cost': 100,  # Search API is expensive!
-        'videos': [],
-        'workflow_hint': 'Use analyze_video() with these video IDs to get complete transcript, metadata, statistics, and comments.',
-        'error': None
-    }
+    result = _SEARCH_RESULT.copy()
+    result['query'] = query
+    result['videos'] = []
 
     # Validate query
     if not query or not query.strip():
@@ -393,6 +417,11 @@ def search_youtube_content(inputs: SearchYouTubeContentInput) -> dict:
     return result
 
 
+# Channel IDs pattern: UC followed by 22 characters (total 24). Matches either
+# a bare channel ID (group 1) or a youtube.com/channel/<CHANNEL_ID> URL (group 2)
+_CHANNEL_ID_RE = re.compile(r'^(UC[A-Za-z0-9_-]{22})$|youtube\.com\/channel\/(UC[A-Za-z0-9_-]{22})')
+
+
 def extract_channel_id(channel_url_or_id: str) -> str:
     """
     Extract YouTube channel ID from a URL or validate a bare channel ID.
@@ -409,16 +438,11 @@ def extract_channel_id(channel_url_or_id: str) -> str:
     # Remove whitespace
     channel_url_or_id = channel_url_or_id.strip()
 
-    # Check if it's already a channel ID (starts with UC, 24 chars alphanumeric)
-    # Channel IDs pattern: UC followed by 22 characters (total 24)
-    if re.match(r'^UC[A-Za-z0-9_-]{22}$', channel_url_or_id):
-        return channel_url_or_id
-
-    # Try to extract from YouTube channel URL: youtube.com/channel/<CHANNEL_ID>
-    pattern_channel = r'youtube\.com\/channel\/(UC[A-Za-z0-9_-]{22})'
-    match = re.search(pattern_channel, channel_url_or_id)
+    # Accept a bare channel ID (starts with UC, 24 chars alphanumeric) or
+    # extract it from a YouTube channel URL: youtube.com/channel/<CHANNEL_ID>
+    match = _CHANNEL_ID_RE.search(channel_url_or_id)
     if match:
-        return match.group(1)
+        return match.group(1) or match.group(2)
 
     # Custom URLs and handles require additional API lookups
     # For MVP, we'll return a helpful error message
@@ -441,6 +465,7 @@ def extract_channel_id(channel_url_or_id: str) -> str:
 
 
 @mcp.tool()
+@run_in_thread
 def get_channel_overview(inputs: GetChannelOverviewInput) -> dict:
     """
     Fetch YouTube channel information and recent uploads. Accepts channel URL or ID.
@@ -470,39 +495,20 @@ def get_channel_overview(inputs: GetChannelOverviewInput) -> dict:
             - thumbnail (str): Thumbnail URL
             - published_at (str): ISO 8601 publish date
         - upload_count (int): Number of uploads returned
-        - quota_cost (int): Total API quota cost (2)
+        - quota_cost (int): Total API quota cost (101, or 0 when cached)
+        - cache_hit (bool): True if served from the tool result cache
         - workflow_hint (str): Guidance to use analyze_video for full data
         - error (str): Error message if fetch failed
     """
     # Extract parameters from inputs (ignores extra n8n parameters)
-    channel_url_or_id = inputs.channel_url_or_id
-    max_uploads = inputs.max_uploads or 10
-
-    # Check cache first
-    cached = _cache_get("get_channel_overview", channel_url_or_id=channel_url_or_id, max_uploads=max_uploads)
-    if cached is not None:
-        return cached
+    channel_url_or_id = inputs['channel_url_or_id']
 
-    # Validate and clamp max_uploads parameter
-    try:
-        max_uploads = int(max_uploads)
-        if max_uploads < 1:
-            max_uploads = 1
-        elif max_uploads > 50:
-            max_uploads = 50
-    except (ValueError, TypeError):
-        max_uploads = 10
+    # Clamp max_uploads to 1-50 (the input schema already guarantees an int)
+    max_uploads = max(1, min(50, inputs.get('max_uploads') or 10))
 
     # Initialize result structure
-    result = {
-        'success': False,
-        'channel': None,
-        'uploads': [],
-        'upload_count': 0,
-        'quota_cost': 2,  # 1 for channel info, 1 for uploads search
-        'workflow_hint': 'Use analyze_video() with upload video IDs to get complete transcript, metadata, statistics, and comments.',
-        'error': None
-    }
+    result = _CHANNEL_OVERVIEW_RESULT.copy()
+    result['uploads'] = []
 
     # Extract and validate channel ID
     try:
@@ -512,6 +518,11 @@ def get_channel_overview(inputs: GetChannelOverviewInput) -> dict:
         result['quota_cost'] = 0
         return result
 
+    # Check cache (keyed by ID so URL variants of one channel share an entry)
+    cached = _cache_get("get_channel_overview", channel_id=channel_id, max_uploads=max_uploads)
+    if cached is not None:
+        return {**cached, 'quota_cost': 0, 'cache_hit': True}
+
     # Fetch channel information
     try:
         channel_info = get_channel_info(channel_id)
@@ -542,7 +553,7 @@ def get_channel_overview(inputs: GetChannelOverviewInput) -> dict:
         # Keep success=True since we got channel data
 
     # Cache the result
-    _cache_set("get_channel_overview", result, channel_url_or_id=channel_url_or_id, max_uploads=max_uploads)
+    _cache_set("get_channel_overview", result, channel_id=channel_id, max_uploads=max_uploads)
 
     return result
 
@@ -561,8 +572,10 @@ def create_mcp_app():
     Returns:
         ASGI application: The FastMCP HTTP application with parameter filtering
     """
-    # Wrap FastMCP's http_app with our n8n parameter filter middleware
-    app = mcp.http_app()
+    # Wrap FastMCP's http_app with our n8n parameter filter middleware.
+    # Stateless mode keeps no per-session state in the process, so requests
+    # can land on any gunicorn worker.
+    app = mcp.http_app(stateless_http=True)
     return N8NParameterFilterMiddleware(app)
 
 